@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from LazyCSS.Build.emit import Rule
+from LazyCSS.Build.project import iter_scan
+from LazyCSS.Build.scanners import scanner_for
+CACHE_DIR = ".lazycss-cache"
+CACHE_VERSION = 4
+MAX_FILE_ENTRIES = 100000
+MAX_RULE_SETS = 8
+MAX_BYTES = 64 << 20
+def hash_file(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+def hash_text(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+def _read_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+def _write_json(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+def clear_cache(directory=CACHE_DIR):
+    shutil.rmtree(directory, ignore_errors=True)
+class BuildCache:
+    def __init__(self, directory=CACHE_DIR, max_entries=MAX_FILE_ENTRIES, max_rule_sets=MAX_RULE_SETS,
+                 max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_rule_sets = max_rule_sets
+        self.max_bytes = max_bytes
+        self.rules_dir = os.path.join(directory, "rules")
+        self.index_path = os.path.join(directory, "files.json")
+        self.outputs_path = os.path.join(directory, "outputs.json")
+        index = _read_json(self.index_path, {})
+        if index.get("version") != CACHE_VERSION:
+            index = {"version": CACHE_VERSION, "files": {}}
+        self.files = index["files"]
+        self.outputs = _read_json(self.outputs_path, {})
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+    def clear(self):
+        clear_cache(self.directory)
+        self.files = {}
+        self.outputs = {}
+        self._dirty = False
+    def _lookup(self, path, parser, scanner):
+        entry = self.files.get(path)
+        if not entry or entry.get("parser") != parser or entry.get("scanner") != scanner:
+            return None
+        st = os.stat(path)
+        if [st.st_mtime_ns, st.st_size] == entry["stat"]:
+            return entry
+        # Touched but unchanged files only need their stat refreshed.
+        if hash_file(path) == entry["hash"]:
+            entry["stat"] = [st.st_mtime_ns, st.st_size]
+            self._dirty = True
+            return entry
+        return None
+    def scan(self, paths, parser=None, workers=None, executor="process", scanners=None):
+        now = time.time()
+        entries = {}
+        stale = []
+        for path in paths:
+            entry = self._lookup(path, parser, scanner_for(path, scanners))
+            if entry is None:
+                stale.append(path)
+            else:
+                entries[path] = entry
+        self.hits += len(entries)
+        self.misses += len(stale)
+        for path, tokens, inline_configs in iter_scan(stale, parser, workers, executor, scanners):
+            st = os.stat(path)
+            entries[path] = self.files[path] = {
+                "hash": hash_file(path),
+                "stat": [st.st_mtime_ns, st.st_size],
+                "parser": parser,
+                "scanner": scanner_for(path, scanners),
+                "tokens": list(tokens),
+                "inline": inline_configs,
+            }
+            self._dirty = True
+        file_classes = {}
+        inline_configs = []
+        for path in paths:
+            entries[path]["used"] = now
+            file_classes[path] = entries[path]["tokens"]
+            inline_configs.extend(entries[path]["inline"])
+        return file_classes, inline_configs
+    def fingerprint(self, theme, config, inline_configs):
+        payload = json.dumps([CACHE_VERSION, theme.source_hash, config, inline_configs], sort_keys=True, default=str)
+        return hash_text(payload)
+    def _rules_path(self, fingerprint):
+        return os.path.join(self.rules_dir, f"{fingerprint}.json")
+    def load_rules(self, fingerprint):
+        path = self._rules_path(fingerprint)
+        if not os.path.exists(path):
+            return {}
+        os.utime(path)
+        return {cls: [Rule(selector, tuple(map(tuple, declarations)), media) for selector, declarations, media in rules]
+                for cls, rules in _read_json(path, {}).items()}
+    def save_rules(self, fingerprint, rules):
+        os.makedirs(self.rules_dir, exist_ok=True)
+        _write_json(self._rules_path(fingerprint), rules)
+    def output_unchanged(self, output_file, css):
+        entry = self.outputs.get(os.path.abspath(output_file))
+        if not entry or not os.path.exists(output_file):
+            return False
+        st = os.stat(output_file)
+        return entry == [hash_text(css), st.st_mtime_ns, st.st_size]
+    def record_output(self, output_file, css):
+        st = os.stat(output_file)
+        self.outputs[os.path.abspath(output_file)] = [hash_text(css), st.st_mtime_ns, st.st_size]
+        self._dirty = True
+    def save(self):
+        if not self._dirty:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._evict()
+        _write_json(self.index_path, {"version": CACHE_VERSION, "files": self.files})
+        _write_json(self.outputs_path, self.outputs)
+        self._dirty = False
+    def _evict(self):
+        if len(self.files) > self.max_entries:
+            by_age = sorted(self.files, key=lambda path: self.files[path].get("used", 0))
+            for path in by_age[:len(self.files) - self.max_entries]:
+                del self.files[path]
+        if not os.path.isdir(self.rules_dir):
+            return
+        rule_sets = sorted((os.path.join(self.rules_dir, name) for name in os.listdir(self.rules_dir)),
+                           key=os.path.getmtime, reverse=True)
+        total = 0
+        for index, path in enumerate(rule_sets):
+            total += os.path.getsize(path)
+            if index >= self.max_rule_sets or total > self.max_bytes:
+                os.remove(path)
@@ -1,3 +1,108 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import namedtuple
+HASH_LENGTH = 8
+MANIFEST_FILE = "manifest.json"
+COMPRESSIONS = ("gz", "br")
+COMPRESS_LEVELS = {"gz": 9, "br": 11}
+Artifact = namedtuple("Artifact", ["path", "digest", "written"])
+def _write_atomic(path, data, mode):
+    # Write beside the target and rename so readers never see a partial file.
+    tmp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_file, mode) as f:
+            f.write(data)
+        os.replace(tmp_file, path)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
 def write_css(css_file, css):
-    with open(css_file, 'w') as f:
-        f.write(css)
+    _write_atomic(css_file, css, 'w')
+def write_bytes(path, data):
+    _write_atomic(path, data, 'wb')
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        raise ImportError("Brotli output requires 'brotli'. Install with: pip install brotli")
+    return brotli
+def compress_css(data, kind, level=None):
+    level = COMPRESS_LEVELS[kind] if level is None else level
+    if kind == "gz":
+        import gzip
+        # A fixed mtime keeps the archive byte-identical for identical CSS.
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    return _brotli().compress(data, quality=level)
+def hashed_name(css_file, digest):
+    root, ext = os.path.splitext(css_file)
+    return f"{root}.{digest}{ext}"
+def _is_previous_build(previous, name):
+    # Only ever delete an earlier hash of this same stylesheet, whatever else the manifest says.
+    root, ext = os.path.splitext(name)
+    return re.fullmatch(re.escape(root[:-HASH_LENGTH]) + rf"[0-9a-f]{{{HASH_LENGTH}}}" + re.escape(ext), previous)
+def output_options(config):
+    options = {
+        "hashed": bool(config.get("hash_output")),
+        "compress": tuple(config.get("compress", ())),
+        "levels": config.get("compress_level") or {},
+        "manifest": config.get("manifest"),
+        "prune": bool(config.get("prune_output")),
+    }
+    return options if options["hashed"] or options["compress"] or options["manifest"] else None
+def read_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+def _unchanged(path, data, hashed):
+    if hashed:
+        return True
+    with open(path, 'rb') as f:
+        return f.read() == data
+def write_artifacts(css_file, css, hashed=False, compress=(), levels=None, manifest=None, prune=False):
+    for kind in compress:
+        if kind not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{kind}', expected one of: {', '.join(COMPRESSIONS)}")
+    if "br" in compress:
+        _brotli()
+    levels = levels or {}
+    data = css.encode('utf-8')
+    digest = hashlib.sha1(data).hexdigest()[:HASH_LENGTH]
+    path = hashed_name(css_file, digest) if hashed else css_file
+    if hashed and manifest is None:
+        manifest = os.path.join(os.path.dirname(css_file), MANIFEST_FILE)
+    targets = [(path, None)] + [(f"{path}.{kind}", kind) for kind in compress]
+    logical = os.path.basename(css_file)
+    entries = read_manifest(manifest) if manifest else {}
+    manifest_dir = os.path.dirname(os.path.abspath(manifest)) if manifest else None
+    name = os.path.relpath(os.path.abspath(path), manifest_dir).replace(os.sep, "/") if manifest else None
+    previous = entries.get(logical)
+    if all(os.path.exists(target) for target, _ in targets) and previous == name and _unchanged(path, data, hashed):
+        return Artifact(path, digest, False)
+    def write(target):
+        target_path, kind = target
+        write_bytes(target_path, compress_css(data, kind, levels.get(kind)) if kind else data)
+    if len(targets) > 1:
+        # zlib and brotli release the GIL, so the variants compress side by side.
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+            list(pool.map(write, targets))
+    else:
+        write(targets[0])
+    if manifest:
+        # The manifest only moves once every artifact it points to is in place.
+        entries[logical] = name
+        write_bytes(manifest, json.dumps(entries, indent=2, sort_keys=True).encode('utf-8'))
+        # Pages still served from a cache may reference the previous hash, so it is only removed on request.
+        if prune and hashed and isinstance(previous, str) and previous != name and _is_previous_build(previous, name):
+            stale = os.path.join(manifest_dir, previous)
+            for stale_path in [stale] + [f"{stale}.{kind}" for kind in COMPRESSIONS]:
+                if os.path.exists(stale_path):
+                    os.remove(stale_path)
+    return Artifact(path, digest, True)
@@ -0,0 +1,116 @@
+import io
+from collections import namedtuple
+from functools import lru_cache
+Rule = namedtuple("Rule", ["selector", "declarations", "media"])
+def split_declarations(block):
+    if not any(ch in block for ch in "\"'("):
+        return block.split(';')
+    # Semicolons inside strings or url()/calc() arguments (data URIs, SVG) do not end a declaration.
+    parts, depth, quote, start = [], 0, None, 0
+    for index, ch in enumerate(block):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")" and depth:
+            depth -= 1
+        elif ch == ";" and not depth:
+            parts.append(block[start:index])
+            start = index + 1
+    parts.append(block[start:])
+    return parts
+@lru_cache(maxsize=4096)
+def parse_declarations(block):
+    declarations = []
+    for part in split_declarations(block):
+        prop, sep, value = part.partition(':')
+        prop = prop.strip()
+        if sep and prop:
+            declarations.append((prop, value.strip()))
+    return tuple(declarations)
+def make_rule(selector, block, media=None):
+    declarations = parse_declarations(block)
+    return Rule(selector, declarations, media) if declarations else None
+# Shorthands whose longhands do not share their prefix; prefix families (margin/margin-left) are matched separately.
+SHORTHANDS = {
+    "gap": ("row-gap", "column-gap", "grid-gap", "grid-row-gap", "grid-column-gap"),
+    "inset": ("top", "right", "bottom", "left"),
+    "font": ("line-height",),
+    "place-content": ("align-content", "justify-content"),
+    "place-items": ("align-items", "justify-items"),
+    "place-self": ("align-self", "justify-self"),
+    "columns": ("column-width", "column-count"),
+    "overflow-wrap": ("word-wrap",),
+}
+SHORTHAND_KEYS = {}
+for _shorthand, _longhands in SHORTHANDS.items():
+    for _prop in (_shorthand,) + _longhands:
+        SHORTHAND_KEYS.setdefault(_prop, set()).add(_shorthand)
+def _property_keys(prop):
+    # Two properties can override each other when they share any key: margin/margin-left by family, gap/row-gap by table.
+    prop = prop.lower()
+    return {prop.lstrip('-').split('-', 1)[0]} | SHORTHAND_KEYS.get(prop, set())
+def group_rules(rules):
+    groups = []
+    grouped = {}
+    last_set = {}
+    for rule in rules:
+        key = (rule.media, rule.declarations)
+        families = {(rule.media, family) for prop, _ in rule.declarations for family in _property_keys(prop)}
+        index = grouped.get(key)
+        # Joining an earlier group moves the selector up, which is only safe if nothing in between
+        # sets the same properties; otherwise the cascade would pick a different winner. 'all' resets
+        # everything, so it never moves.
+        if index is None or any(last_set.get(family, -1) > index for family in families) or \
+                any(prop == "all" for prop, _ in rule.declarations):
+            index = grouped[key] = len(groups)
+            groups.append((rule.media, rule.declarations, [rule.selector]))
+        elif rule.selector not in groups[index][2]:
+            groups[index][2].append(rule.selector)
+        for family in families:
+            last_set[family] = max(last_set.get(family, -1), index)
+    return [Rule(",".join(selectors), declarations, media) for media, declarations, selectors in groups]
+def emit(rules, stream, minify=False):
+    write = stream.write
+    media_blocks = {}
+    first = True
+    for rule in rules:
+        if rule.media is not None:
+            media_blocks.setdefault(rule.media, []).append(rule)
+            continue
+        if minify:
+            write(f"{rule.selector}{{{';'.join(f'{p}:{v}' for p, v in rule.declarations)}}}")
+        else:
+            if not first:
+                write("\n")
+            write(f"{rule.selector} {{\n")
+            for prop, value in rule.declarations:
+                write(f"    {prop}: {value};\n")
+            write("}\n")
+        first = False
+    for media, media_rules in media_blocks.items():
+        if minify:
+            write(f"@media {media.replace(': ', ':')}{{")
+            for rule in media_rules:
+                write(f"{rule.selector}{{{';'.join(f'{p}:{v}' for p, v in rule.declarations)}}}")
+            write("}")
+            continue
+        if not first:
+            write("\n")
+        write(f"@media {media} {{\n")
+        for index, rule in enumerate(media_rules):
+            if index:
+                write("\n")
+            write(f"    {rule.selector} {{\n")
+            for prop, value in rule.declarations:
+                write(f"        {prop}: {value};\n")
+            write("    }\n")
+        write("}\n")
+        first = False
+def emit_string(rules, minify=False):
+    buffer = io.StringIO()
+    emit(rules, buffer, minify)
+    return buffer.getvalue()
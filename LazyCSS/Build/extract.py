@@ -0,0 +1,111 @@
+import codecs
+import html
+import mmap
+import os
+import re
+CHUNK_SIZE = 1 << 20
+MMAP_THRESHOLD = 16 << 20
+MAX_TAG_LENGTH = 1 << 16
+PARSERS = ("stream", "bs4")
+OPEN_RE = re.compile(r"<(?=[A-Za-z!])")
+TAG_RE = re.compile(r"""<([A-Za-z][^\s/>]*)((?:[^>"']|"[^"]*"|'[^']*')*)>""")
+ATTR_RE = re.compile(r"""([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+RAW_TEXT_END = {
+    "script": re.compile(r"</script", re.I),
+    "style": re.compile(r"</style", re.I),
+}
+LAZY_CONFIG_RE = re.compile(r'<script id="lazy-config">([\s\S]*?)</script>')
+def parse_attributes(attrs):
+    parsed = {}
+    for match in ATTR_RE.finditer(attrs):
+        name, double, single, bare = match.groups()
+        value = double if double is not None else single if single is not None else bare
+        parsed[name.lower()] = html.unescape(value) if value else ""
+    return parsed
+class ClassExtractor:
+    def __init__(self):
+        self.inline_config = []
+        self._buffer = ""
+    def feed(self, text):
+        self._buffer += text
+        return self._scan(final=False)
+    def close(self):
+        found = self._scan(final=True)
+        self._buffer = ""
+        return found
+    def _scan(self, final):
+        buf = self._buffer
+        n = len(buf)
+        pos = 0
+        found = []
+        while True:
+            opening = OPEN_RE.search(buf, pos)
+            if not opening:
+                # Keep a trailing "<" so a tag split across chunks is seen whole.
+                pos = n - 1 if buf.endswith("<") and not final else n
+                break
+            i = opening.start()
+            if buf.startswith("<!", i):
+                end_marker = "-->" if buf.startswith("<!--", i) else ">"
+                j = buf.find(end_marker, i + 2)
+                if j < 0:
+                    pos = n if final else i
+                    break
+                pos = j + len(end_marker)
+                continue
+            tag = TAG_RE.match(buf, i, min(n, i + MAX_TAG_LENGTH))
+            if not tag:
+                if final or n - i >= MAX_TAG_LENGTH:
+                    pos = i + 1
+                    continue
+                pos = i
+                break
+            name = tag.group(1).lower()
+            attrs = parse_attributes(tag.group(2)) if tag.group(2) else {}
+            raw_end = RAW_TEXT_END.get(name)
+            if raw_end:
+                close = raw_end.search(buf, tag.end())
+                if not close:
+                    if not final:
+                        pos = i
+                        break
+                    close_start = n
+                else:
+                    close_start = close.start()
+                if name == "script" and attrs.get("id") == "lazy-config":
+                    self.inline_config.append(buf[tag.end():close_start])
+                pos = close_start
+            else:
+                pos = tag.end()
+            if "class" in attrs:
+                found.append(attrs["class"])
+        self._buffer = buf[pos:]
+        return found
+def read_chunks(path, chunk_size=CHUNK_SIZE, use_mmap=None):
+    if use_mmap is None:
+        use_mmap = os.path.getsize(path) >= MMAP_THRESHOLD
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with open(path, 'rb') as f:
+        if use_mmap and os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for start in range(0, len(mm), chunk_size):
+                    yield decoder.decode(mm[start:start + chunk_size])
+        else:
+            for block in iter(lambda: f.read(chunk_size), b""):
+                yield decoder.decode(block)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+def iter_class_attributes(chunks, extractor=None):
+    if extractor is None:
+        extractor = ClassExtractor()
+    if isinstance(chunks, str):
+        chunks = (chunks,)
+    for chunk in chunks:
+        yield from extractor.feed(chunk)
+    yield from extractor.close()
+def extract_with_bs4(html_string):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html_string, 'html.parser')
+    class_values = [" ".join(tag['class']) for tag in soup.find_all() if tag.has_attr('class')]
+    return class_values, [m.group(1) for m in LAZY_CONFIG_RE.finditer(html_string)][:1]
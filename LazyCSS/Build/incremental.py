@@ -0,0 +1,87 @@
+import os
+from collections import Counter
+from LazyCSS.Build.builder import compile_css
+from LazyCSS.Build.project import iter_scan, merge_classes, scan_file
+from LazyCSS.Build.stats import NULL_STATS
+from LazyCSS.Build.theme import get_default_theme
+class IncrementalBuild:
+    def __init__(self, config=None, theme=None, parser=None, workers=None, executor="process"):
+        self.config = config or {}
+        self.theme = theme or get_default_theme()
+        self.parser = parser
+        self.workers = workers
+        self.executor = executor
+        self.scanners = self.config.get("scanners")
+        self.file_classes = {}
+        self.file_configs = {}
+        self.class_counts = Counter()
+        self.file_stats = {}
+        self.rule_cache = {}
+        self.dirty = True
+        self._rendered_config = None
+        self._theme_hash = self.theme.source_hash
+    def scan(self, paths):
+        for path in paths:
+            self.file_stats[path] = self._stat(path)
+        for path, tokens, inline_configs in iter_scan(paths, self.parser, self.workers, self.executor, self.scanners):
+            self._set_config(path, inline_configs)
+            self._set_file(path, tokens)
+    def sync(self, paths):
+        paths = [os.path.abspath(path) for path in paths]
+        for path in set(self.file_stats) - set(paths):
+            self.remove_file(path)
+        self.scan([path for path in paths if self.file_stats.get(path) != self._stat(path)])
+    def _stat(self, path):
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    def _set_config(self, path, inline_configs):
+        if inline_configs != self.file_configs.get(path, []):
+            self.file_configs[path] = inline_configs
+            self.dirty = True
+    def update_file(self, path):
+        path = os.path.abspath(path)
+        self.file_stats[path] = self._stat(path)
+        tokens, inline_configs = scan_file(path, self.parser, self.scanners)
+        self._set_config(path, inline_configs)
+        return self._set_file(path, tokens)
+    def remove_file(self, path):
+        path = os.path.abspath(path)
+        self.file_stats.pop(path, None)
+        if self.file_configs.pop(path, None):
+            self.dirty = True
+        if path not in self.file_classes:
+            return set(), set()
+        return self._set_file(path, [])
+    def _set_file(self, path, tokens):
+        previous_tokens = self.file_classes.get(path, [])
+        previous, current = set(previous_tokens), set(tokens)
+        added, removed = set(), set()
+        for cls in current - previous:
+            self.class_counts[cls] += 1
+            if self.class_counts[cls] == 1:
+                added.add(cls)
+        for cls in previous - current:
+            self.class_counts[cls] -= 1
+            if not self.class_counts[cls]:
+                del self.class_counts[cls]
+                removed.add(cls)
+        if tokens:
+            self.file_classes[path] = tokens
+        else:
+            self.file_classes.pop(path, None)
+        # A reordered file can change which rule wins, even with the same classes.
+        if added or removed or tokens != previous_tokens:
+            self.dirty = True
+        return added, removed
+    def render(self, stats=NULL_STATS):
+        self.theme.refresh()
+        config = dict(self.config)
+        inline_configs = [c for configs in self.file_configs.values() for c in configs]
+        if (inline_configs, self.theme.source_hash) != (self._rendered_config, self._theme_hash):
+            # Config references and base styles may resolve differently now.
+            self.rule_cache.clear()
+            self._rendered_config = inline_configs
+            self._theme_hash = self.theme.source_hash
+        css = compile_css(merge_classes(self.file_classes), inline_configs, config, self.theme, self.rule_cache, stats)
+        self.dirty = False
+        return css
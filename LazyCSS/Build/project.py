@@ -0,0 +1,78 @@
+import glob
+import os
+from LazyCSS.Build.scanners import DIRECTORY_EXTENSIONS, scan_path, scanner_for
+EXECUTORS = {"process": "ProcessPoolExecutor", "thread": "ThreadPoolExecutor"}
+def resolve_inputs(patterns, root=None, scanners=None):
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    extensions = DIRECTORY_EXTENSIONS | set(scanners or ())
+    paths = {}
+    for pattern in patterns:
+        if root and not os.path.isabs(pattern):
+            pattern = os.path.join(root, pattern)
+        is_dir = os.path.isdir(pattern)
+        if is_dir:
+            pattern = os.path.join(pattern, "**", "*")
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        for path in sorted(matches):
+            if is_dir and os.path.splitext(path)[1].lower() not in extensions:
+                continue
+            if os.path.isfile(path):
+                paths.setdefault(os.path.abspath(path), None)
+    return list(paths)
+def pattern_roots(patterns, root=None):
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    roots = {}
+    for pattern in patterns:
+        if root and not os.path.isabs(pattern):
+            pattern = os.path.join(root, pattern)
+        recursive = True
+        if not os.path.isdir(pattern):
+            parts = []
+            for part in pattern.split(os.sep):
+                if glob.has_magic(part):
+                    break
+                parts.append(part)
+            # An explicit file only needs its own directory, not everything below it.
+            recursive = len(parts) < len(pattern.split(os.sep))
+            pattern = os.sep.join(parts) if recursive else os.path.dirname(pattern)
+        root_dir = os.path.abspath(pattern or '.')
+        roots[root_dir] = roots.get(root_dir, False) or recursive
+    return sorted((root_dir, recursive) for root_dir, recursive in roots.items()
+                  if not any(root_dir.startswith(other + os.sep) and roots[other] for other in roots))
+def scan_file(path, parser=None, scanners=None):
+    class_values, inline_configs = scan_path(path, scanner_for(path, scanners), parser)
+    # Tokens keep document order: when two rules set the same property, the first-used class is emitted first.
+    return list(dict.fromkeys(cls for value in class_values for cls in value.split())), inline_configs
+def _scan_file_args(args):
+    return scan_file(*args)
+def iter_scan(paths, parser=None, workers=None, executor="process", scanners=None):
+    workers = workers or os.cpu_count() or 1
+    jobs = [(path, parser, scanners) for path in paths]
+    if workers == 1 or len(jobs) < 2:
+        for path, result in zip(paths, map(_scan_file_args, jobs)):
+            yield path, *result
+        return
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor '{executor}', expected one of: {', '.join(EXECUTORS)}")
+    workers = min(workers, len(jobs))
+    chunksize = max(1, len(jobs) // (workers * 4))
+    # Pool machinery (and multiprocessing for the process pool) is only imported when a pool is needed.
+    import concurrent.futures
+    with getattr(concurrent.futures, EXECUTORS[executor])(max_workers=workers) as pool:
+        for path, result in zip(paths, pool.map(_scan_file_args, jobs, chunksize=chunksize)):
+            yield path, *result
+def scan_files(paths, parser=None, workers=None, executor="process", scanners=None):
+    file_classes = {}
+    inline_configs = []
+    for path, tokens, configs in iter_scan(paths, parser, workers, executor, scanners):
+        file_classes[path] = tokens
+        inline_configs.extend(configs)
+    return file_classes, inline_configs
+def merge_classes(file_classes):
+    # First-seen order over sorted paths, so one file builds like generate_css() and watch matches one-shot.
+    used = {}
+    for path in sorted(file_classes):
+        used.update(dict.fromkeys(file_classes[path]))
+    return list(used)
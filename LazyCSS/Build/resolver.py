@@ -0,0 +1,106 @@
+import re
+import threading
+from collections import OrderedDict, namedtuple
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+SHADE_RE = re.compile(r"([a-z]+)-(\d+)")
+BORDER_RE = re.compile(r"(border(?:-[trbl])?)-\[(.*?)\]")
+GRID_COLS_RE = re.compile(r"gridCols-(\d+)")
+Z_INDEX_RE = re.compile(r"zIndex-\[(.*?)\]")
+PAIR_RE = re.compile(r"(hw|mp)-\[(.*?)\]")
+CONFIG_REF_RE = re.compile(r"(\w+)-\{(.*?)\}")
+BORDER_SIDES = {'border': 'border', 'border-t': 'border-top', 'border-r': 'border-right',
+                'border-b': 'border-bottom', 'border-l': 'border-left'}
+class StyleResolver:
+    def __init__(self, prop_map, color_palette, maxsize=4096):
+        self.prop_map = prop_map
+        self.color_palette = color_palette
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._prop_re = re.compile(rf"({'|'.join(map(re.escape, prop_map.keys()))})-\[(.*?)\]")
+    def resolve(self, s, config):
+        if "{" in s:
+            # Config references depend on the caller's config, so they are never cached.
+            return self._resolve(s, config)
+        with self._lock:
+            rule = self._cache.get(s)
+            if rule is not None:
+                self._cache.move_to_end(s)
+                self.hits += 1
+                return rule
+            self.misses += 1
+        rule = self._resolve(s, config)
+        with self._lock:
+            self._cache[s] = rule
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return rule
+    def cache_info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._cache))
+    def cache_clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+    def _format(self, definition, value):
+        if isinstance(definition, dict):
+            return f"{definition.get('p')}:{value}{';position:absolute' if definition.get('pos') else ''};"
+        return f"{definition}:{value};"
+    def _resolve(self, s, config):
+        s = s.replace("_", " ")
+        head, sep, rest = s.partition("-")
+        if not sep:
+            return ""
+        if head in ("bg", "c", "border"):
+            match = SHADE_RE.fullmatch(rest)
+            if match:
+                hex_color = self.color_palette.get(match.group(1), {}).get(match.group(2))
+                return f"{self.prop_map[head]}:{hex_color};" if hex_color else ""
+            if head == "border":
+                match = BORDER_RE.fullmatch(s)
+                if match:
+                    return self._border(match.group(1), match.group(2))
+        elif head == "gridCols":
+            match = GRID_COLS_RE.fullmatch(s)
+            if match:
+                return f"grid-template-columns: repeat({int(match.group(1))}, minmax(0, 1fr));"
+        elif head == "zIndex":
+            match = Z_INDEX_RE.fullmatch(s)
+            if match:
+                z_index_value = match.group(1)
+                if not z_index_value or z_index_value[0] in "0123456789" or z_index_value == "auto":
+                    return f"z-index: {z_index_value};"
+        elif head in ("hw", "mp"):
+            match = PAIR_RE.fullmatch(s)
+            if match:
+                vals = [v.strip() for v in match.group(2).split(',')]
+                a, b = (vals[0], vals[1]) if len(vals) > 1 else (vals[0], vals[0])
+                if head == 'hw':
+                    return f"height:{a};width:{b};"
+                return f"margin:{a};padding:{b};"
+        if rest.startswith("["):
+            match = self._prop_re.fullmatch(s)
+            if match:
+                definition = self.prop_map.get(match.group(1))
+                return self._format(definition, match.group(2)) if definition else ""
+        elif rest.startswith("{"):
+            match = CONFIG_REF_RE.fullmatch(s)
+            if match:
+                prop, config_key = match.groups()
+                if config_key in config and prop in self.prop_map:
+                    return self._format(self.prop_map[prop], config[config_key])
+        return ""
+    def _border(self, prefix, value):
+        border_values = [v.strip() for v in value.split(',')]
+        width = border_values[0] if len(border_values) > 0 else '1px'
+        style = border_values[1] if len(border_values) > 1 else 'solid'
+        color = border_values[2] if len(border_values) > 2 else 'currentColor'
+        lazy_color_match = SHADE_RE.fullmatch(color)
+        if lazy_color_match:
+            hex_color = self.color_palette.get(lazy_color_match.group(1), {}).get(lazy_color_match.group(2))
+            if hex_color:
+                color = hex_color
+        return f"{BORDER_SIDES[prefix]}:{width} {style} {color};"
@@ -0,0 +1,154 @@
+import html
+import mmap
+import os
+import re
+from contextlib import contextmanager
+from LazyCSS.Build.extract import ClassExtractor, extract_with_bs4, iter_class_attributes, read_chunks
+MAP_THRESHOLD = 64 << 10
+MAX_EXPRESSION = 1 << 14
+DEFAULT_SCANNER = "html"
+# Attribute names are matched on their own so ":class", "data-class" and "v-bind:class" are not read as class.
+MARKUP_CLASS_RE = re.compile(rb"""(?<![\w:.@-])(?:class|className)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+JSX_CLASS_RE = re.compile(rb"""(?<![\w:.@-])(?:class|className)\s*=\s*(?:"([^"]*)"|'([^']*)'|(\{))""")
+VUE_BOUND_CLASS_RE = re.compile(rb"""(?<![\w.-])(?::|v-bind:)class\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+JINJA_CLASS_RE = re.compile(rb"""(?<![\w:.@-])class\s*=\s*(["'])""")
+JINJA_STOP_RE = {b'"': re.compile(rb'"|\{[{%#]'), b"'": re.compile(rb"'|\{[{%#]")}
+TEMPLATE_TAG_END = {b"{": b"}}", b"%": b"%}", b"#": b"#}"}
+TEMPLATE_TAG_RE = re.compile(rb"\{([{%#])([\s\S]*?)[}%#]\}")
+STRING_RE = re.compile(rb""""((?:[^"\\\n]|\\.)*)"|'((?:[^'\\\n]|\\.)*)'|`((?:[^`\\]|\\.)*)`""")
+OBJECT_KEY_RE = re.compile(rb"[{,]\s*([A-Za-z_$][\w$]*)\s*:")
+INTERPOLATION_RE = re.compile(rb"\$\{([^}]*)\}")
+BRACE_RE = re.compile(rb"[{}]")
+ATTRIBUTE_LIST_RE = re.compile(rb"\{:?[ \t]*([.#][^{}\n]*)\}")
+ATTRIBUTE_LIST_CLASS_RE = re.compile(rb"(?:^|[ \t])\.([^\s{}]+)")
+LAZY_CONFIG_RE = re.compile(rb'<script id="lazy-config">([\s\S]*?)</script>')
+def _strings(expression):
+    for match in STRING_RE.finditer(expression):
+        double, single, template = match.groups()
+        if template is not None:
+            yield INTERPOLATION_RE.sub(b" ", template)
+            for body in INTERPOLATION_RE.findall(template):
+                yield from _strings(body)
+        else:
+            yield double if double is not None else single
+def _expression(buffer, start):
+    # The attribute expression runs to its matching brace; runaway expressions are cut off.
+    depth = 1
+    end = min(len(buffer), start + MAX_EXPRESSION)
+    for match in BRACE_RE.finditer(buffer, start, end):
+        depth += 1 if match.group() == b"{" else -1
+        if not depth:
+            return buffer[start:match.start()]
+    return buffer[start:end]
+def scan_markup(buffer):
+    for match in MARKUP_CLASS_RE.finditer(buffer):
+        yield match.group(1) if match.group(1) is not None else match.group(2)
+def scan_jsx(buffer):
+    for match in JSX_CLASS_RE.finditer(buffer):
+        double, single, brace = match.groups()
+        if brace:
+            # className={cx("btn", active && "btn-active")} contributes every string literal it contains.
+            yield from _strings(_expression(buffer, match.end()))
+        else:
+            yield double if double is not None else single
+def scan_vue(buffer):
+    yield from scan_markup(buffer)
+    for match in VUE_BOUND_CLASS_RE.finditer(buffer):
+        expression = match.group(1) if match.group(1) is not None else match.group(2)
+        yield from _strings(expression)
+        yield b" ".join(OBJECT_KEY_RE.findall(expression))
+def _template_value(match):
+    kind, body = match.groups()
+    if kind == b"#":
+        return b" "
+    return b" " + b" ".join(_strings(body)) + b" "
+def _jinja_value(buffer, start, quote):
+    # Walk tag by tag to the closing quote; unterminated values give up at MAX_EXPRESSION bytes.
+    end = min(len(buffer), start + MAX_EXPRESSION)
+    stop_re = JINJA_STOP_RE[quote]
+    pos = start
+    while True:
+        stop = stop_re.search(buffer, pos, end)
+        if not stop:
+            return None, end
+        if stop.group() == quote:
+            return buffer[start:stop.start()], stop.end()
+        close = buffer.find(TEMPLATE_TAG_END[stop.group()[1:]], stop.end(), end)
+        if close < 0:
+            return None, end
+        pos = close + 2
+def scan_jinja(buffer):
+    pos = 0
+    while True:
+        match = JINJA_CLASS_RE.search(buffer, pos)
+        if not match:
+            return
+        value, pos = _jinja_value(buffer, match.end(), match.group(1))
+        if value is None:
+            pos = match.end()
+            continue
+        # {% if %}/{{ }} tags are dropped but the string literals inside them are kept as candidates.
+        yield TEMPLATE_TAG_RE.sub(_template_value, value)
+def scan_markdown(buffer):
+    yield from scan_markup(buffer)
+    for match in ATTRIBUTE_LIST_RE.finditer(buffer):
+        yield b" ".join(ATTRIBUTE_LIST_CLASS_RE.findall(match.group(1)))
+SCANNERS = {
+    "html": None,
+    "jsx": scan_jsx,
+    "vue": scan_vue,
+    "jinja": scan_jinja,
+    "markdown": scan_markdown,
+    "markup": scan_markup,
+}
+EXTENSIONS = {
+    ".html": "html", ".htm": "html",
+    ".jsx": "jsx", ".tsx": "jsx", ".js": "jsx", ".ts": "jsx", ".mjs": "jsx",
+    ".vue": "vue",
+    ".jinja": "jinja", ".jinja2": "jinja", ".j2": "jinja", ".njk": "jinja", ".twig": "jinja", ".djhtml": "jinja",
+    ".md": "markdown", ".markdown": "markdown", ".mdx": "jsx",
+}
+# Plain scripts are only scanned when named explicitly, so directories do not pull in bundles or vendored code.
+DIRECTORY_EXTENSIONS = {ext for ext in EXTENSIONS if ext not in (".js", ".ts", ".mjs")}
+def register_scanner(name, scan, extensions=()):
+    SCANNERS[name] = scan
+    for ext in extensions:
+        EXTENSIONS[ext.lower()] = name
+def scanner_for(path, scanners=None):
+    ext = os.path.splitext(path)[1].lower()
+    name = (scanners or {}).get(ext) or EXTENSIONS.get(ext, DEFAULT_SCANNER)
+    if name not in SCANNERS:
+        raise ValueError(f"Unknown scanner '{name}', expected one of: {', '.join(SCANNERS)}")
+    return name
+@contextmanager
+def map_file(path):
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MAP_THRESHOLD:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+def _decode(value):
+    text = value.decode('utf-8', errors='replace')
+    return html.unescape(text) if "&" in text else text
+def scan_buffer(buffer, name):
+    if isinstance(buffer, str):
+        buffer = buffer.encode('utf-8')
+    if name == "html":
+        extractor = ClassExtractor()
+        class_values = list(iter_class_attributes(str(buffer, 'utf-8', 'replace'), extractor))
+        return class_values, extractor.inline_config[:1]
+    class_values = [_decode(value) for value in SCANNERS[name](buffer) if value]
+    return class_values, [str(m.group(1), 'utf-8', 'replace') for m in LAZY_CONFIG_RE.finditer(buffer)][:1]
+def scan_path(path, name=None, parser=None):
+    name = name or scanner_for(path)
+    if name == "html":
+        if parser == "bs4":
+            with open(path, 'r', encoding='utf-8') as f:
+                return extract_with_bs4(f.read())
+        extractor = ClassExtractor()
+        class_values = list(iter_class_attributes(read_chunks(path), extractor))
+        return class_values, extractor.inline_config[:1]
+    with map_file(path) as buffer:
+        return scan_buffer(buffer, name)
@@ -0,0 +1,45 @@
+import threading
+import time
+class BuildScheduler:
+    def __init__(self, build, delay=0.1):
+        self.build = build
+        self.delay = delay
+        self._pending = {}
+        self._generation = 0
+        self._deadline = 0
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="lazycss-build", daemon=True)
+    def start(self):
+        self._thread.start()
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join()
+    def submit(self, path, kind="modified"):
+        with self._condition:
+            # The last event wins, except that a created file stays created when it is then modified.
+            if not (kind == "modified" and self._pending.get(path) == "created"):
+                self._pending[path] = kind
+            self._generation += 1
+            self._deadline = time.monotonic() + self.delay
+            self._condition.notify()
+    def superseded(self, generation):
+        return self._generation != generation
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    if self._pending:
+                        remaining = self._deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                if self._stopped:
+                    return
+                changes, self._pending = self._pending, {}
+                generation = self._generation
+            self.build(changes, lambda: self.superseded(generation))
@@ -0,0 +1,37 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+class BuildStats:
+    enabled = True
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+    def as_dict(self):
+        return {"stages": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+                "total": round(sum(self.stages.values()), 6), "counters": dict(self.counters)}
+    def to_json(self):
+        return json.dumps(self.as_dict(), indent=2)
+    def report(self):
+        lines = ["Build stats:"]
+        for name, seconds in self.stages.items():
+            lines.append(f"  {name:<18} {seconds * 1000:9.2f} ms")
+        lines.append(f"  {'total':<18} {sum(self.stages.values()) * 1000:9.2f} ms")
+        for name, value in self.counters.items():
+            lines.append(f"  {name:<18} {value:>9}")
+        return "\n".join(lines)
+class NullStats:
+    enabled = False
+    def stage(self, name):
+        return nullcontext()
+    def count(self, name, value=1):
+        pass
+NULL_STATS = NullStats()
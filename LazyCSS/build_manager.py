@@ -2,43 +2,89 @@ import os
 import sys
 import time
 import json
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
 try:
-    from LazyCSS.Build.builder import generate_css
-    from LazyCSS.Build.dump import write_css
+    from LazyCSS.Build.builder import compile_css, select_parser
+    from LazyCSS.Build.project import merge_classes, pattern_roots, resolve_inputs, scan_files
+    from LazyCSS.Build.scanners import DIRECTORY_EXTENSIONS
+    from LazyCSS.Build.cache import BuildCache, CACHE_DIR, MAX_BYTES, clear_cache
+    from LazyCSS.Build.incremental import IncrementalBuild
+    from LazyCSS.Build.scheduler import BuildScheduler
+    from LazyCSS.Build.stats import BuildStats, NULL_STATS
+    from LazyCSS.Build.theme import Theme, ThemeError
+    from LazyCSS.Build.dump import output_options, write_artifacts, write_css
 except ImportError:
     print("Error: Could not import LazyCSS.  Ensure it's installed or in a sibling directory.", file=sys.stderr)
     sys.exit(1)
 
 CONFIG_FILE = "lazy-config.json" 
+DEBOUNCE_MS = 100
 
-class BuildManagerEventHandler(FileSystemEventHandler):
+class BuildManagerEventHandler:
     def __init__(self, watch_filepath, css_filepath, build_manager):
-        super().__init__()
         self.watch_file = watch_filepath
+        self.watch_paths = set(build_manager.resolve_inputs(watch_filepath))
+        self.watch_exts = {os.path.splitext(path)[1].lower() for path in self.watch_paths} | DIRECTORY_EXTENSIONS
         self.css_file = css_filepath
-        self.last_modified = 0
         self.last_css_content = self.get_current_css()
         self.build_manager = build_manager  
+        self.scheduler = None
     def get_current_css(self):
         try:
             with open(self.css_file, 'r') as f:
                 return f.read()
         except FileNotFoundError:
             return ""
+    def watch_dirs(self):
+        return [(path, recursive) for path, recursive in pattern_roots(self.watch_file) if os.path.isdir(path)]
+    def submit(self, path, kind):
+        path = os.path.abspath(path)
+        if path in self.watch_paths or (kind == "created" and os.path.splitext(path)[1].lower() in self.watch_exts):
+            self.scheduler.submit(path, kind)
+    def dispatch(self, event):
+        # Same routing as watchdog's FileSystemEventHandler, without importing watchdog for one-shot builds.
+        handler = getattr(self, f"on_{event.event_type}", None)
+        if handler:
+            handler(event)
     def on_modified(self, event):
-        if event.src_path == os.path.abspath(self.watch_file):
-            current_modified = os.path.getmtime(self.watch_file)
-            if current_modified > self.last_modified:
-                self.last_modified = current_modified
-                self.build_manager.build_and_compare(self.watch_file, self.css_file)
+        if not event.is_directory:
+            self.submit(event.src_path, "modified")
+    def on_created(self, event):
+        if not event.is_directory:
+            self.submit(event.src_path, "created")
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.submit(event.src_path, "deleted")
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.submit(event.src_path, "deleted")
+            self.submit(event.dest_path, "created")
 class BuildManager:
-    def __init__(self, include_config=False):
+    def __init__(self, include_config=False, parser=None, workers=None, use_cache=False, debounce_ms=None):
         self.include_config = include_config
         self.config = {}
         self.load_config()  
         self.event_handler = None 
+        self.theme = None
+        self.incremental = None
+        self.stats_format = None
+        self.stats_file = None
+        self.last_stats = None
+        self.startup = {}
+        self.parser = select_parser(parser, self.config)
+        self.workers = workers or self.config.get("workers")
+        self.executor = self.config.get("executor", "process")
+        self.scanners = self.config.get("scanners")
+        self.debounce_ms = debounce_ms if debounce_ms is not None else self.config.get("debounce_ms", DEBOUNCE_MS)
+        self.cache = None
+        if use_cache:
+            self.cache = BuildCache(self.config.get("cache_dir", CACHE_DIR),
+                                    max_bytes=self.config.get("cache_max_bytes", MAX_BYTES))
+    def clear_cache(self):
+        # --no-cache leaves self.cache unset, but the directory on disk is still cleared.
+        if self.cache:
+            self.cache.clear()
+        else:
+            clear_cache(self.config.get("cache_dir", CACHE_DIR))
     def load_config(self):  
         if self.include_config:
             if not os.path.exists(CONFIG_FILE):
@@ -75,45 +121,163 @@ class BuildManager:
         except Exception as e:
             print(f"Error creating config file: {e}", file=sys.stderr)
             sys.exit(1)
-    def build(self, input_file, output_file):
+    def get_theme(self):
         try:
-            with open(input_file, 'r') as f:
-                html_content = f.read()
-            css = generate_css(html_content,self.config)
+            if self.theme is None:
+                start_time = time.perf_counter()
+                self.theme = Theme()
+                self.startup["theme_ms"] = (time.perf_counter() - start_time) * 1000
+            else:
+                self.theme.refresh()
+        except ThemeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return self.theme
+    def resolve_inputs(self, input_file):
+        return resolve_inputs(input_file, scanners=self.scanners)
+    def status(self, message):
+        # Keep stdout clean for JSON stats so '--stats-json | jq' works.
+        json_on_stdout = self.stats_format == "json" and self.stats_file in (None, "-")
+        print(message, file=sys.stderr if json_on_stdout else sys.stdout)
+    def new_stats(self):
+        return BuildStats() if self.stats_format else NULL_STATS
+    def report_stats(self, stats):
+        self.last_stats = stats
+        if self.stats_format == "text":
+            print(stats.report())
+        elif self.stats_format == "json":
+            if self.stats_file in (None, "-"):
+                print(stats.to_json())
+            else:
+                with open(self.stats_file, 'w') as f:
+                    f.write(stats.to_json())
+    def generate(self, input_file, stats=NULL_STATS):
+        paths = self.resolve_inputs(input_file)
+        if not paths:
+            raise FileNotFoundError(input_file)
+        with stats.stage("theme"):
+            theme = self.get_theme()
+        config = dict(self.config)
+        stats.count("files", len(paths))
+        if self.cache is None:
+            with stats.stage("scan"):
+                file_classes, inline_configs = scan_files(paths, self.parser, self.workers, self.executor, self.scanners)
+            return compile_css(merge_classes(file_classes), inline_configs, config, theme, stats=stats)
+        with stats.stage("scan"):
+            hits, misses = self.cache.hits, self.cache.misses
+            file_classes, inline_configs = self.cache.scan(paths, self.parser, self.workers, self.executor, self.scanners)
+            fingerprint = self.cache.fingerprint(theme, self.config, inline_configs)
+            rules = self.cache.load_rules(fingerprint)
+        stats.count("cache_file_hits", self.cache.hits - hits)
+        stats.count("cache_file_misses", self.cache.misses - misses)
+        known_rules = len(rules)
+        css = compile_css(merge_classes(file_classes), inline_configs, config, theme, rules, stats)
+        if len(rules) != known_rules:
+            self.cache.save_rules(fingerprint, rules)
+        return css
+    def write_output(self, output_file, css, stats=NULL_STATS):
+        options = output_options(self.config)
+        if options:
+            artifact = write_artifacts(output_file, css, **options)
+            path, written = artifact.path, artifact.written
+        elif self.cache and self.cache.output_unchanged(output_file, css):
+            path, written = output_file, False
+        else:
             write_css(output_file, css)
+            path, written = output_file, True
+            if self.cache:
+                self.cache.record_output(output_file, css)
+        if not written:
+            stats.count("writes_skipped")
+        return path, written
+    def build(self, input_file, output_file):
+        try:
+            stats = self.new_stats()
+            css = self.generate(input_file, stats)
+            with stats.stage("write"):
+                path, written = self.write_output(output_file, css, stats)
+                self.status(f"Initialized {path}" if written else f"{path} is up to date")
+                if self.cache:
+                    self.cache.save()
             if self.event_handler:
                self.event_handler.last_css_content = css
-            print(f"Initialized {output_file}")
+            self.report_stats(stats)
         except FileNotFoundError:
             print(f"Error: Could not find {input_file}", file=sys.stderr)
             sys.exit(1)
         except Exception as e:
             print(f"Error during build: {e}", file=sys.stderr)
             sys.exit(1)
-    def build_and_compare(self, input_file, output_file):
+    def rebuild_files(self, changes, output_file, superseded=lambda: False):
         try:
-            with open(input_file, 'r') as f:
-                html_content = f.read()
-            new_css = generate_css(html_content,self.config) 
-            if self.event_handler and new_css != self.event_handler.last_css_content: # Compare
-                print("Detected change. Building...")
-                start_time = time.time()
-                write_css(output_file, new_css)
-                self.event_handler.last_css_content = new_css 
+            start_time = time.time()
+            stats = self.new_stats()
+            handler = self.event_handler
+            if "created" in changes.values():
+                # New files only count when they match the configured inputs.
+                handler.watch_paths = set(self.resolve_inputs(handler.watch_file))
+            added, removed = set(), set()
+            with stats.stage("scan"):
+                for path in changes:
+                    # Coalesced events can lag behind the disk (delete then recreate), so trust the file itself.
+                    if not os.path.exists(path) or path not in handler.watch_paths:
+                        diff = self.incremental.remove_file(path)
+                    else:
+                        diff = self.incremental.update_file(path)
+                    added |= diff[0]
+                    removed |= diff[1]
+            stats.count("files", len(changes))
+            if not self.incremental.dirty or superseded():
+                return
+            new_css = self.incremental.render(stats)
+            if superseded():
+                # The newer batch must still write this render, even if it brings no class changes of its own.
+                self.incremental.dirty = True
+                return
+            if new_css != handler.last_css_content:
+                self.status(f"Detected change (+{len(added)} -{len(removed)} classes). Building...")
+                with stats.stage("write"):
+                    self.write_output(output_file, new_css, stats)
+                handler.last_css_content = new_css
                 end_time = time.time()
-                print(f"Build in {end_time - start_time:.3f} seconds")
+                self.status(f"Build in {end_time - start_time:.3f} seconds")
+                self.report_stats(stats)
         except Exception as e:
             print(f"Error during build: {e}", file=sys.stderr)
     def watch(self, input_file, output_file):
+        try:
+            from watchdog.observers import Observer
+        except ImportError:
+            print("Error: Watch mode requires 'watchdog'. Install with: pip install watchdog", file=sys.stderr)
+            sys.exit(1)
         self.event_handler = BuildManagerEventHandler(input_file, output_file, self) # Pass self
-        self.build(input_file, output_file) 
+        try:
+            self.incremental = IncrementalBuild(self.config, self.get_theme(), self.parser, self.workers, self.executor)
+            stats = self.new_stats()
+            with stats.stage("scan"):
+                self.incremental.scan(sorted(self.event_handler.watch_paths))
+            css = self.incremental.render(stats)
+            with stats.stage("write"):
+                path, _ = self.write_output(output_file, css, stats)
+            self.event_handler.last_css_content = css
+            self.status(f"Initialized {path}")
+            self.report_stats(stats)
+        except Exception as e:
+            print(f"Error during build: {e}", file=sys.stderr)
+            sys.exit(1)
+        scheduler = BuildScheduler(lambda changes, superseded: self.rebuild_files(changes, output_file, superseded),
+                                   self.debounce_ms / 1000)
+        self.event_handler.scheduler = scheduler
+        scheduler.start()
         observer = Observer()
-        observer.schedule(self.event_handler, path=os.path.dirname(os.path.abspath(input_file)) or '.', recursive=False)
+        for watch_dir, recursive in self.event_handler.watch_dirs():
+            observer.schedule(self.event_handler, path=watch_dir, recursive=recursive)
         observer.start()
-        print(f"Watching {input_file} for changes...")
+        self.status(f"Watching {len(self.event_handler.watch_paths)} file(s) for changes...")
         try:
-            while True:
-                time.sleep(1)
+            while observer.is_alive():
+                observer.join(1)
         except KeyboardInterrupt:
             observer.stop()
         observer.join()
+        scheduler.stop()
@@ -0,0 +1,254 @@
+import hmac
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from LazyCSS.Build.builder import generate_css
+from LazyCSS.Build.dump import output_options, write_artifacts, write_css
+from LazyCSS.Build.incremental import IncrementalBuild
+from LazyCSS.Build.project import resolve_inputs
+from LazyCSS.Build.theme import Theme
+CONFIG_FILE = "lazy-config.json"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 64 << 20
+FIELD_TYPES = {str: "a string", dict: "an object", "patterns": "a string or a list of strings"}
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+class RequestError(Exception):
+    pass
+def inside(root, path):
+    root = os.path.realpath(root)
+    return os.path.commonpath([root, os.path.realpath(path)]) == root
+def field(payload, name, kind, required=False):
+    value = payload.get(name)
+    if value is None:
+        if required:
+            raise RequestError(f"Missing '{name}'")
+        return None
+    if kind == "patterns":
+        valid = isinstance(value, str) or (isinstance(value, list) and all(isinstance(item, str) for item in value))
+    else:
+        valid = isinstance(value, kind)
+    if not valid:
+        raise RequestError(f"'{name}' must be {FIELD_TYPES[kind]}")
+    return value
+class Project:
+    def __init__(self, root, theme):
+        self.root = root
+        self.theme = theme
+        self.lock = threading.Lock()
+        self.config = {}
+        self.config_stat = None
+        self.incremental = None
+        self.last_css = None
+        self.outputs = {}
+    def load_config(self):
+        config_path = os.path.join(self.root, CONFIG_FILE)
+        try:
+            st = os.stat(config_path)
+        except FileNotFoundError:
+            st = None
+        stat = (st.st_mtime_ns, st.st_size) if st else None
+        if stat == self.config_stat and self.incremental is not None:
+            return
+        config = {}
+        if st:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        # A new config can change every rule, so start from a fresh incremental state.
+        self.config, self.config_stat = config, stat
+        self.incremental = IncrementalBuild(config, self.theme, config.get("parser"), config.get("workers", 1),
+                                            config.get("executor", "process"))
+        self.last_css = None
+    def build(self, content=None, output=None):
+        with self.lock:
+            start_time = time.perf_counter()
+            self.load_config()
+            content = content or self.config.get("content") or self.config.get("input_file", "index.html")
+            output = os.path.join(self.root, output or self.config.get("output_file", "style.css"))
+            # Requests may come from any local process, so writes never leave the project directory.
+            if not inside(self.root, output):
+                raise RequestError(f"Output '{output}' is outside the project")
+            paths = resolve_inputs(content, self.root, self.config.get("scanners"))
+            if not paths:
+                raise RequestError(f"No input files match {content}")
+            outside = [path for path in paths if not inside(self.root, path)]
+            if outside:
+                raise RequestError(f"Input '{outside[0]}' is outside the project")
+            self.incremental.sync(paths)
+            written = False
+            target = self.outputs.get(output, output)
+            if self.incremental.dirty or self.last_css is None or not os.path.exists(target):
+                css = self.incremental.render()
+                options = output_options(self.config)
+                os.makedirs(os.path.dirname(output), exist_ok=True)
+                if options:
+                    if options["manifest"]:
+                        options["manifest"] = os.path.join(self.root, options["manifest"])
+                        if not inside(self.root, options["manifest"]):
+                            raise RequestError(f"Manifest '{options['manifest']}' is outside the project")
+                    # Hashed and compressed artifacts decide for themselves whether anything changed.
+                    artifact = write_artifacts(output, css, **options)
+                    target, written = artifact.path, artifact.written
+                elif css != self.last_css or not os.path.exists(output):
+                    write_css(output, css)
+                    written = True
+                self.outputs[output] = target
+                self.last_css = css
+            return {"ok": True, "output": target, "written": written, "files": len(paths),
+                    "classes": len(self.incremental.class_counts),
+                    "ms": round((time.perf_counter() - start_time) * 1000, 3)}
+class BuildServer:
+    def __init__(self, theme=None, allowed_projects=None):
+        self.theme = theme or Theme()
+        self.allowed_projects = [os.path.realpath(root) for root in allowed_projects or ()]
+        self.projects = {}
+        self.lock = threading.Lock()
+    def project(self, root):
+        if root is None:
+            if len(self.allowed_projects) != 1:
+                raise RequestError("Missing 'project'")
+            root = self.allowed_projects[0]
+        root = os.path.abspath(root)
+        if self.allowed_projects and not any(inside(allowed, root) for allowed in self.allowed_projects):
+            raise RequestError(f"Project directory '{root}' is not served")
+        if not os.path.isdir(root):
+            raise RequestError(f"Project directory '{root}' does not exist")
+        with self.lock:
+            if root not in self.projects:
+                self.projects[root] = Project(root, self.theme)
+            return self.projects[root]
+    def handle(self, path, payload):
+        if path == "/build":
+            project = self.project(field(payload, "project", str))
+            content, output = field(payload, "content", "patterns"), field(payload, "output", str)
+            self.theme.refresh()
+            return project.build(content, output)
+        if path == "/css":
+            html_string = field(payload, "html", str, required=True)
+            config = dict(field(payload, "config", dict) or {})
+            parser = field(payload, "parser", str)
+            self.theme.refresh()
+            try:
+                return {"ok": True, "css": generate_css(html_string, config, self.theme, parser)}
+            except ValueError as e:
+                raise RequestError(str(e))
+        if path == "/stats":
+            return {"ok": True, "resolver": self.theme.resolver.cache_info()._asdict(), "projects": sorted(self.projects)}
+        raise RequestError(f"Unknown endpoint '{path}'")
+class BuildRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = 5
+    def address_string(self):
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "local"
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+    def send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        # One request per connection: an idle keep-alive client would otherwise hold a pool worker.
+        self.close_connection = True
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+    def allowed(self):
+        # Only loopback names are accepted over TCP, so DNS rebinding cannot reach the server from a web page.
+        if isinstance(self.client_address, tuple):
+            host = self.headers.get("Host", "")
+            hostname = host[1:host.find("]")] if host.startswith("[") else host.rsplit(":", 1)[0]
+            if hostname.lower() not in LOCAL_HOSTS | {self.server.server_address[0]}:
+                self.send_json(403, {"ok": False, "error": f"Host '{host}' is not allowed"})
+                return False
+        token = self.server.token
+        if token and not hmac.compare_digest(self.headers.get("Authorization", "").encode(),
+                                                   f"Bearer {token}".encode()):
+            self.send_json(401, {"ok": False, "error": "Missing or invalid token"})
+            return False
+        return True
+    def do_GET(self):
+        if self.allowed():
+            self.dispatch({})
+    def do_POST(self):
+        if not self.allowed():
+            return
+        # Browsers cannot send application/json cross-origin without a preflight, which this server never grants.
+        if self.headers.get_content_type() != "application/json":
+            self.send_json(415, {"ok": False, "error": "Content-Type must be application/json"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.send_json(413, {"ok": False, "error": "Request body too large"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            self.send_json(400, {"ok": False, "error": f"Invalid JSON: {e}"})
+            return
+        if not isinstance(payload, dict):
+            self.send_json(400, {"ok": False, "error": "Request body must be a JSON object"})
+            return
+        self.dispatch(payload)
+    def dispatch(self, payload):
+        try:
+            self.send_json(200, self.server.build_server.handle(self.path, payload))
+        except RequestError as e:
+            self.send_json(400, {"ok": False, "error": str(e)})
+        except Exception as e:
+            self.send_json(500, {"ok": False, "error": f"Error during build: {e}"})
+class PooledServerMixin:
+    def init_pool(self, build_server, workers, verbose, token=None):
+        self.build_server = build_server
+        self.verbose = verbose
+        self.token = token
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lazycss-worker")
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+class PooledHTTPServer(PooledServerMixin, HTTPServer):
+    pass
+if hasattr(socketserver, "UnixStreamServer"):
+    class PooledUnixHTTPServer(PooledServerMixin, socketserver.UnixStreamServer):
+        pass
+def create_server(host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None, workers=None, theme=None, verbose=False,
+                  token=None, projects=None):
+    if not token and not projects:
+        raise ValueError("The build server needs a token or at least one allowed project directory")
+    build_server = BuildServer(theme, projects)
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = PooledUnixHTTPServer(socket_path, BuildRequestHandler)
+    else:
+        server = PooledHTTPServer((host, port), BuildRequestHandler)
+    server.init_pool(build_server, workers or os.cpu_count() or 1, verbose, token)
+    return server
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None, workers=None, verbose=False, token=None,
+          projects=None):
+    server = create_server(host, port, socket_path, workers, verbose=verbose, token=token, projects=projects)
+    address = socket_path or f"http://{host}:{server.server_address[1]}"
+    print(f"Lazy CSS build server listening on {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+    print("Lazy CSS build server stopped", file=sys.stderr)
@@ -0,0 +1,112 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from LazyCSS.Build.builder import apply_inline_config, format_css, lookup_base_styles, process_classes
+from LazyCSS.Build.dump import write_css
+from LazyCSS.Build.extract import ClassExtractor, iter_class_attributes
+from LazyCSS.Build.theme import Theme
+from corpus import CORPORA, build_corpora
+STAGES = ["read", "extract", "process_classes", "base_styles", "format", "write_css"]
+MIN_COMPARE_SECONDS = 0.001
+def run_pipeline(paths, config, theme, output_file):
+    timings = {}
+    start = time.perf_counter()
+    documents = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            documents.append(f.read())
+    timings["read"] = time.perf_counter() - start
+    start = time.perf_counter()
+    class_values = []
+    inline_configs = []
+    for html_string in documents:
+        extractor = ClassExtractor()
+        class_values.extend(iter_class_attributes(html_string, extractor))
+        inline_configs.extend(extractor.inline_config[:1])
+    timings["extract"] = time.perf_counter() - start
+    start = time.perf_counter()
+    config = dict(config)
+    apply_inline_config(config, inline_configs)
+    elements = [{"class": value} for value in class_values]
+    media_queries = {}
+    rules = process_classes(elements, set(), config, theme.resolver, theme.breakpoints, media_queries)
+    timings["process_classes"] = time.perf_counter() - start
+    start = time.perf_counter()
+    used_classes = {cls for el in elements for cls in el.get('class', '').split()}
+    base_rules = lookup_base_styles(used_classes, theme)
+    timings["base_styles"] = time.perf_counter() - start
+    start = time.perf_counter()
+    css = format_css(base_rules, rules, media_queries, config, theme, used_classes)
+    timings["format"] = time.perf_counter() - start
+    start = time.perf_counter()
+    write_css(output_file, css)
+    timings["write_css"] = time.perf_counter() - start
+    timings["total"] = sum(timings.values())
+    stats = {"files": len(paths), "input_bytes": sum(map(len, documents)), "class_attributes": len(class_values),
+             "unique_classes": len(used_classes), "output_bytes": len(css)}
+    return timings, stats
+def run_benchmarks(corpora, repeat, output_dir):
+    theme = Theme()
+    results = {}
+    for name, (paths, config) in corpora.items():
+        best = {}
+        for _ in range(repeat):
+            theme.resolver.cache_clear()
+            timings, stats = run_pipeline(paths, config, theme, os.path.join(output_dir, f"{name}.css"))
+            for stage, seconds in timings.items():
+                best[stage] = min(best.get(stage, seconds), seconds)
+        results[name] = {"timings": best, "stats": stats}
+        print(f"{name:16} " + " ".join(f"{stage}={best[stage] * 1000:.1f}ms" for stage in STAGES + ["total"]))
+    return results
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        for stage, seconds in result["timings"].items():
+            old = previous["timings"].get(stage)
+            if old and old >= MIN_COMPARE_SECONDS and seconds > old * (1 + threshold):
+                regressions.append((name, stage, old, seconds))
+    return regressions
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Lazy CSS build pipeline on synthetic corpora.")
+    parser.add_argument("--corpus-dir", help="Directory for the generated corpora (default: a temporary directory)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Scale factor for corpus sizes (default: 1.0)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for corpus generation (default: 1)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per corpus; the fastest is kept (default: 3)")
+    parser.add_argument("--only", action="append", choices=list(CORPORA),
+                        help="Only generate and run the named corpus; may be repeated")
+    parser.add_argument("-o", "--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative slowdown reported as a regression (default: 0.1)")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_dir = args.corpus_dir or tmp_dir
+        corpora = build_corpora(corpus_dir, args.scale, args.seed, args.only and list(dict.fromkeys(args.only)))
+        results = run_benchmarks(corpora, args.repeat, tmp_dir)
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(), "scale": args.scale,
+                 "seed": args.seed, "repeat": args.repeat, "timestamp": time.time()},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for name, stage, old, new in regressions:
+            print(f"REGRESSION {name}/{stage}: {old * 1000:.2f}ms -> {new * 1000:.2f}ms", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import json
+import os
+import random
+COLORS = ["orange", "black", "gray", "red", "yellow", "green", "blue", "purple", "pink", "teal", "slate"]
+SHADES = ["50", "100", "200", "300", "400", "500", "600", "700", "800", "900", "950"]
+BASE = ["flex", "grid", "hidden", "block", "relative", "absolute", "align-c", "justify-c", "justify-between"]
+PROPS = ["p", "m", "w", "h", "pl", "pr", "mt", "mb", "fs", "round", "gap"]
+TAGS = ["div", "section", "span", "p", "a", "li", "button"]
+def utility(rng):
+    kind = rng.random()
+    if kind < 0.3:
+        return f"{rng.choice(['bg', 'c', 'border'])}-{rng.choice(COLORS)}-{rng.choice(SHADES)}"
+    if kind < 0.6:
+        return f"{rng.choice(PROPS)}-[{rng.randint(1, 64)}px]"
+    if kind < 0.8:
+        return rng.choice(BASE)
+    if kind < 0.9:
+        return f"gridCols-{rng.randint(1, 12)}"
+    return f"hw-[{rng.randint(1, 400)}px,{rng.randint(1, 400)}px]"
+def variant(rng):
+    inner = ",".join(utility(rng) for _ in range(rng.randint(1, 3)))
+    return f"{rng.choice(['hover', 'active', 'sm', 'md', 'lg', 'xl'])}-({inner})"
+def element(rng, variant_ratio, custom_names):
+    classes = [utility(rng) for _ in range(rng.randint(1, 6))]
+    if rng.random() < variant_ratio:
+        classes.extend(variant(rng) for _ in range(rng.randint(1, 3)))
+    if custom_names and rng.random() < 0.3:
+        classes.append(rng.choice(custom_names))
+    tag = rng.choice(TAGS)
+    return f'<{tag} class="{" ".join(classes)}">text</{tag}>'
+def page(rng, size, variant_ratio=0.05, custom_names=()):
+    parts = ["<!DOCTYPE html><html><head><title>bench</title></head><body>"]
+    length = len(parts[0])
+    while length < size:
+        part = element(rng, variant_ratio, custom_names)
+        parts.append(part)
+        length += len(part) + 1
+    parts.append("</body></html>")
+    return "\n".join(parts)
+def custom_classes(rng, count):
+    return {f"ds-{i}": f"color: #{rng.randrange(1 << 24):06x}; padding: {rng.randint(1, 40)}px;" for i in range(count)}
+def write_pages(directory, pages):
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name, html in pages:
+        path = os.path.join(directory, name)
+        with open(path, 'w') as f:
+            f.write(html)
+        paths.append(path)
+    return paths
+def small_pages(rng, directory, scaled):
+    return write_pages(directory, [(f"page{i}.html", page(rng, 4000)) for i in range(scaled(50))]), {}
+def large_page(rng, directory, scaled):
+    return write_pages(directory, [("index.html", page(rng, scaled(10 << 20)))]), {}
+def many_files(rng, directory, scaled):
+    return write_pages(directory, [(f"page{i}.html", page(rng, 2000)) for i in range(scaled(2000))]), {}
+def variants(rng, directory, scaled):
+    return write_pages(directory, [(f"page{i}.html", page(rng, 20000, variant_ratio=0.8)) for i in range(scaled(50))]), {}
+def design_system(rng, directory, scaled):
+    classes = custom_classes(rng, scaled(5000))
+    names = list(classes)
+    return (write_pages(directory, [(f"page{i}.html", page(rng, 8000, custom_names=names)) for i in range(scaled(50))]),
+            {"custom_classes": classes})
+CORPORA = {
+    "small-pages": small_pages,
+    "large-page": large_page,
+    "many-files": many_files,
+    "variants": variants,
+    "custom-classes": design_system,
+}
+def build_corpora(directory, scale=1.0, seed=1, names=None):
+    corpora = {}
+    def scaled(n):
+        return max(1, int(n * scale))
+    for name in names or CORPORA:
+        # Each corpus has its own generator, so selecting a subset does not change what is generated.
+        rng = random.Random(f"{seed}:{name}")
+        corpora[name] = CORPORA[name](rng, os.path.join(directory, name), scaled)
+    with open(os.path.join(directory, "corpora.json"), 'w') as f:
+        json.dump({"scale": scale, "seed": seed, "corpora": {name: len(paths) for name, (paths, _) in corpora.items()}}, f)
+    return corpora
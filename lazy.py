@@ -1,49 +1,164 @@
+import time
+STARTUP_TIME = time.perf_counter()
 import argparse
 import os
 import sys
 from LazyCSS.build_manager import BuildManager
+from LazyCSS.Build.extract import PARSERS
+from LazyCSS.Build.dump import COMPRESSIONS
+IMPORT_TIME = time.perf_counter()
 
 # SETTINGS
 WATCH_FILE = "index.html"
 OUTPUT_FILE = "style.css"
 INCLUDE_CONFIG = False  
+PROFILE_FILE = "lazycss.prof"
 
 # CODES ARE SUBJECT TO LICENSE - Check LICENSE for more details
 # THIS FILE "lazy.py" is made to manage Lazy CSS
 # - Please provide a valid file name in WATCH_FILE.
-# - Lazy CSS only supports one CSS file.  Multiple files will cause an error.
+# - Lazy CSS writes one CSS file. Several HTML inputs can feed it through
+#   --content or "content": ["templates/**/*.html"] in lazy-config.json.
+# - Files are scanned by extension: HTML, JSX/TSX, Vue, Jinja/Django and
+#   Markdown. Map other extensions in "scanners": {".html": "jinja"}.
 # - INCLUDE_CONFIG:
 #     - Defaults to False.
 #     - Set to True to use a 'lazy-config.json' file.
 #     - Used for Lazy CSS configuration.
+# - Only custom_classes used by the inputs are written. List classes added at
+#   runtime in "safelist": ["is-open", "/^toast-/"] or pass --safelist.
+# - --hash writes style.<hash>.css plus manifest.json, and --compress gz/br adds
+#   precompressed copies; nothing is rewritten while the CSS is unchanged.
+#   Earlier hashed builds are kept unless --prune (or "prune_output": true) is set.
+#   Levels are set with "compress_level": {"gz": 9, "br": 11}.
+# - "python lazy.py serve" runs a resident build server. POST JSON to /build
+#   ({"project": dir}) or /css ({"html": ...}) to reuse its warm caches.
+#   Start it with --project DIR (allowed roots) and/or --token. Requests need
+#   Content-Type: application/json, and inputs and outputs must stay inside
+#   the project directory.
 # - Lazy CSS is under development; more features are coming.
 # - Requires 'watchdog'. Install with: pip install watchdog
+# - 'beautifulsoup4' is optional; it is only needed for --parser bs4.
 
 """"
 DO NOT CHANGE THE CODE BELOW
 """
+def serve_main(argv):
+    from LazyCSS.server import DEFAULT_HOST, DEFAULT_PORT, serve
+    parser = argparse.ArgumentParser(prog="lazy.py serve", description="Run a resident Lazy CSS build server.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--socket", metavar="PATH", help="Listen on a Unix domain socket instead of TCP")
+    parser.add_argument("-j", "--workers", type=int, help="Number of request workers (default: CPU count)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every request")
+    parser.add_argument("--token", default=os.environ.get("LAZYCSS_TOKEN"),
+                        help="Require 'Authorization: Bearer TOKEN' on every request (default: $LAZYCSS_TOKEN)")
+    parser.add_argument("--project", action="append", metavar="DIR",
+                        help="Only build projects under DIR; may be repeated (required unless --token is set)")
+    args = parser.parse_args(argv)
+    if not args.token and not args.project:
+        print("Error: 'lazy.py serve' needs --project DIR or --token.", file=sys.stderr)
+        sys.exit(1)
+    serve(args.host, args.port, args.socket, args.workers, args.verbose, args.token, args.project)
+def print_startup_trace(build_manager, init_time):
+    build_manager.get_theme()
+    heavy = [name for name in ("watchdog", "bs4", "multiprocessing", "http.server") if name in sys.modules]
+    print("Startup trace:", file=sys.stderr)
+    print(f"  imports            {(IMPORT_TIME - STARTUP_TIME) * 1000:8.2f} ms", file=sys.stderr)
+    print(f"  init               {(init_time - IMPORT_TIME) * 1000:8.2f} ms", file=sys.stderr)
+    print(f"  theme              {build_manager.startup['theme_ms']:8.2f} ms", file=sys.stderr)
+    print(f"  heavy modules      {', '.join(heavy) or 'none'}", file=sys.stderr)
 def main():
+    if sys.argv[1:2] == ["serve"]:
+        serve_main(sys.argv[2:])
+        return
     parser = argparse.ArgumentParser(description="Generate CSS from HTML with Lazy CSS.")
     parser.add_argument("input_file", nargs='?', help=f"Input HTML file (default: {WATCH_FILE})")
     parser.add_argument("output_file", nargs='?', help=f"Output CSS file (default: {OUTPUT_FILE})")
     parser.add_argument("-b", "--build", action="store_true", help="Perform a single build and exit")
     parser.add_argument("-c", "--config", action="store_const", const=True, default=INCLUDE_CONFIG,
                         help=f"Include and use lazy-config.json (default: {INCLUDE_CONFIG})")
+    parser.add_argument("--content", action="append", metavar="PATTERN",
+                        help="Input file, directory or glob pattern; may be repeated (overrides input_file)")
+    parser.add_argument("-j", "--workers", type=int,
+                        help="Number of workers used to scan multiple input files (default: CPU count)")
+    parser.add_argument("--debounce", type=int, metavar="MS",
+                        help="Coalesce file changes arriving within this many milliseconds in watch mode (default: 100)")
+    parser.add_argument("--minify", action="store_true", help="Write minified CSS")
+    parser.add_argument("--group-selectors", action="store_true",
+                        help="Merge selectors that share identical declaration blocks")
+    parser.add_argument("--hash", action="store_true",
+                        help="Write a content-hashed file (style.<hash>.css) and record it in manifest.json")
+    parser.add_argument("--compress", action="append", choices=COMPRESSIONS,
+                        help="Also write a precompressed .gz or .br (needs 'brotli') copy; may be repeated")
+    parser.add_argument("--manifest", metavar="FILE",
+                        help="Manifest mapping output names to written files (default: manifest.json with --hash)")
+    parser.add_argument("--prune", action="store_true",
+                        help="With --hash, delete the previous hashed build and its compressed copies")
+    parser.add_argument("--safelist", action="append", metavar="CLASS",
+                        help="Always emit CLASS, or every Lazy.json/custom class matching /REGEX/; may be repeated")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not read or write the build cache for single builds")
+    parser.add_argument("--clear-cache", action="store_true", help="Delete the build cache before building")
+    parser.add_argument("--stats", action="store_true", help="Print per-stage timings and counters after each build")
+    parser.add_argument("--stats-json", action="store_true", help="Write build stats as JSON (to stdout by default)")
+    parser.add_argument("--stats-file", metavar="FILE", help="Write the JSON build stats to FILE instead of stdout")
+    parser.add_argument("--profile", action="store_true", help="Run the build under cProfile")
+    parser.add_argument("--profile-file", metavar="FILE",
+                        help=f"Dump the cProfile stats to FILE (implies --profile; default: {PROFILE_FILE})")
+    parser.add_argument("--startup-trace", action="store_true", help="Report import, init and theme load times")
+    parser.add_argument("--parser", choices=PARSERS,
+                        help="HTML class extractor: 'stream' (default) or the BeautifulSoup fallback 'bs4'")
     args = parser.parse_args()
+    if args.content and args.output_file is None:
+        # With --content the only positional argument is the output file.
+        args.input_file, args.output_file = None, args.input_file
     include_config = args.config
-    build_manager = BuildManager(include_config=include_config)
-    input_filepath = args.input_file or build_manager.config.get("input_file", WATCH_FILE)
+    build_manager = BuildManager(include_config=include_config, parser=args.parser, workers=args.workers,
+                                 use_cache=not args.no_cache, debounce_ms=args.debounce)
+    if args.minify:
+        build_manager.config["minify"] = True
+    if args.group_selectors:
+        build_manager.config["group_selectors"] = True
+    if args.hash:
+        build_manager.config["hash_output"] = True
+    if args.compress:
+        build_manager.config["compress"] = list(dict.fromkeys(args.compress))
+    if args.manifest:
+        build_manager.config["manifest"] = args.manifest
+    if args.prune:
+        build_manager.config["prune_output"] = True
+    if args.safelist:
+        build_manager.config["safelist"] = build_manager.config.get("safelist", []) + args.safelist
+    if args.stats_json or args.stats_file:
+        build_manager.stats_format, build_manager.stats_file = "json", args.stats_file or "-"
+    elif args.stats:
+        build_manager.stats_format = "text"
+    if args.clear_cache:
+        build_manager.clear_cache()
+    input_filepath = args.content or args.input_file or build_manager.config.get("content") \
+        or build_manager.config.get("input_file", WATCH_FILE)
     output_filepath = args.output_file or build_manager.config.get("output_file", OUTPUT_FILE)
-    if not os.path.exists(input_filepath):
-        print(f"Error: Input file '{input_filepath}' not found.", file=sys.stderr)
+    if not build_manager.resolve_inputs(input_filepath):
+        print(f"Error: Input file '{', '.join(input_filepath) if isinstance(input_filepath, list) else input_filepath}' not found.", file=sys.stderr)
         exit(1)
     output_dir = os.path.dirname(output_filepath)
     if output_dir and not os.path.exists(output_dir):
         os.makedirs(output_dir)
-    if args.build:
-        build_manager.build(input_filepath, output_filepath)
+    if args.startup_trace:
+        print_startup_trace(build_manager, time.perf_counter())
+    run = build_manager.build if args.build else build_manager.watch
+    profile_file = args.profile_file or (PROFILE_FILE if args.profile else None)
+    if profile_file:
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(run, input_filepath, output_filepath)
+        finally:
+            profiler.dump_stats(profile_file)
+            print(f"Profile written to {profile_file}", file=sys.stderr)
     else:
-        build_manager.watch(input_filepath, output_filepath)
+        run(input_filepath, output_filepath)
 
 # RUN LAZY CSS
 if __name__ == "__main__":
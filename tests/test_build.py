@@ -0,0 +1,106 @@
+import os
+import sys
+import threading
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from LazyCSS.Build.emit import Rule, emit_string, group_rules
+from LazyCSS.Build.extract import ClassExtractor, extract_with_bs4, iter_class_attributes
+from LazyCSS.Build.scanners import MAX_EXPRESSION, SCANNERS, scan_buffer
+from LazyCSS.Build.scheduler import BuildScheduler
+PAGE = """<!DOCTYPE html>
+<html><head>
+<script id="lazy-config">{"minify": true}</script>
+<script>var s = '<div class="not-a-class">';</script>
+<style>.x > .y { color: red }</style>
+</head><body>
+<!-- <div class="commented"></div> -->
+<DIV CLASS="upper  case">x</DIV>
+<div class='single w-[10px]' data-x="a > b">y</div>
+<div class=bare></div>
+<a href="#" class="p-[1px]   m-[2px]
+    hover-(c-[red])">z</a>
+<img class="amp&amp;ersand" src="a.png"/>
+<p title='"quoted"' class="c-[#fff]">é</p>
+</body></html>
+"""
+def tokens(class_values):
+    return [value.split() for value in class_values if value.split()]
+def stream(chunks):
+    extractor = ClassExtractor()
+    return tokens(iter_class_attributes(chunks, extractor)), extractor.inline_config[:1]
+@pytest.mark.parametrize("size", [1, 2, 7, len(PAGE)])
+def test_stream_matches_bs4(size):
+    pytest.importorskip("bs4")
+    class_values, inline_configs = extract_with_bs4(PAGE)
+    chunks = [PAGE[i:i + size] for i in range(0, len(PAGE), size)]
+    assert stream(chunks) == (tokens(class_values), inline_configs)
+def test_stream_chunking_is_stable():
+    expected = stream(PAGE)
+    assert expected[0][0] == ["upper", "case"]
+    assert expected[1] == ['{"minify": true}']
+    assert stream(list(PAGE)) == expected
+def rule(selector, *declarations, media=None):
+    return Rule(selector, tuple(declarations), media)
+def test_group_rules_merges_identical_blocks():
+    grouped = group_rules([rule(".a", ("color", "red")), rule(".b", ("margin", "0")), rule(".c", ("color", "red"))])
+    assert grouped == [rule(".a,.c", ("color", "red")), rule(".b", ("margin", "0"))]
+@pytest.mark.parametrize("first, between", [
+    (("margin", "0"), ("margin-left", "4px")),
+    (("margin-left", "4px"), ("margin", "0")),
+    (("gap", "1px"), ("row-gap", "2px")),
+    (("inset", "0"), ("top", "1px")),
+    (("font", "12px serif"), ("line-height", "2")),
+    (("all", "unset"), ("color", "red")),
+])
+def test_group_rules_keeps_cascade_order(first, between):
+    rules = [rule(".a", first), rule(".b", between), rule(".c", first)]
+    assert group_rules(rules) == rules
+def test_group_rules_ignores_other_media():
+    rules = [rule(".a", ("margin", "0")), rule(".b", ("margin-left", "4px"), media="(min-width: 640px)"),
+             rule(".c", ("margin", "0"))]
+    assert group_rules(rules)[0] == rule(".a,.c", ("margin", "0"))
+    assert "margin-left" in emit_string(group_rules(rules))
+def run_scheduler(events):
+    builds = []
+    done = threading.Event()
+    def build(changes, superseded):
+        builds.append(changes)
+        done.set()
+    scheduler = BuildScheduler(build, delay=0.05)
+    scheduler.start()
+    try:
+        for path, kind in events:
+            scheduler.submit(path, kind)
+        assert done.wait(5)
+    finally:
+        scheduler.stop()
+    return builds
+@pytest.mark.parametrize("events, expected", [
+    ([("a.html", "deleted"), ("a.html", "created")], {"a.html": "created"}),
+    ([("a.html", "created"), ("a.html", "modified")], {"a.html": "created"}),
+    ([("a.html", "created"), ("a.html", "deleted")], {"a.html": "deleted"}),
+    ([("a.html", "modified"), ("b.html", "deleted"), ("a.html", "modified")],
+     {"a.html": "modified", "b.html": "deleted"}),
+])
+def test_scheduler_coalesces_events(events, expected):
+    assert run_scheduler(events) == [expected]
+@pytest.mark.parametrize("name", [name for name, scan in SCANNERS.items() if scan] + ["html"])
+@pytest.mark.parametrize("source", [
+    '<div class="never closed',
+    "<div className={cx('a', ",
+    '<div :class="{ open: ',
+    '<div class="{% if x %}a {{ "b" ',
+    '<div class="{{ ',
+    "{: .a .b",
+    "<div class",
+    "<",
+])
+def test_scanners_handle_unterminated_input(name, source):
+    class_values, inline_configs = scan_buffer(source, name)
+    assert all(isinstance(value, str) for value in class_values)
+    assert inline_configs == []
+@pytest.mark.parametrize("name", ["jsx", "jinja"])
+def test_scanners_cap_runaway_expressions(name):
+    source = ('<div className={"a" ' if name == "jsx" else '<div class="{{ "a" ') + "x " * MAX_EXPRESSION
+    class_values, _ = scan_buffer(source, name)
+    assert len("".join(class_values)) <= MAX_EXPRESSION